@@ -1,4 +1,7 @@
+import re
 import uuid
+from typing import BinaryIO
+from xml.sax.saxutils import escape, quoteattr
 
 from lxml import etree
 
@@ -18,6 +21,128 @@ def _nsmap(ns: str, tag: str) -> str:
     return f"{{{_NS[ns]}}}{tag}"
 
 
+_NS_MESSAGING = {"eb3": _NS["eb3"]}
+
+_TAG_MESSAGING = _nsmap('eb3', 'Messaging')
+
+_TEXT_ENTITIES = {'\r': "&#13;"}
+
+_INVALID_XML_MESSAGE = (
+    "All strings must be XML compatible: "
+    "Unicode or ASCII, no NULL bytes or control characters"
+)
+
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+
+def _xml_str(value: str | bytes) -> str:
+    """
+    Validates that a value can be placed into an XML document as-is, accepting the
+    same values lxml accepts for element text and attributes.
+
+    :param value: The value to validate; ``bytes`` must be ASCII.
+    :return: The value as a string.
+    :rtype: str
+    :raises TypeError: If the value is neither a string nor bytes.
+    :raises ValueError: If the value contains characters not allowed in XML.
+    """
+    if isinstance(value, bytes):
+        try:
+            value = value.decode('ascii')
+        except UnicodeDecodeError:
+            raise ValueError(_INVALID_XML_MESSAGE) from None
+    elif not isinstance(value, str):
+        raise TypeError(f"Argument must be bytes or unicode, got {type(value).__name__!r}")
+    if _INVALID_XML_CHARS.search(value):
+        raise ValueError(_INVALID_XML_MESSAGE)
+    return value
+
+
+def _xml_text(value: str | bytes | None) -> str:
+    """
+    Escapes a value for use as XML element text, preserving carriage returns.
+    `None` renders as empty text, as it does when assigned to ``element.text``.
+
+    :param value: The text to escape.
+    :return: The escaped text.
+    :rtype: str
+    """
+    if value is None:
+        return ''
+    return escape(_xml_str(value), _TEXT_ENTITIES)
+
+
+def _xml_attr(value: str | bytes) -> str:
+    """
+    Escapes and quotes a value for use as an XML attribute value, preserving
+    tabs and line breaks.
+
+    :param value: The attribute value to quote.
+    :return: The quoted attribute value, including the surrounding quotes.
+    :rtype: str
+    """
+    return quoteattr(_xml_str(value))
+
+
+_TEMPLATE = (
+    f'<eb3:UserMessage xmlns:eb3="{_NS["eb3"]}">'
+    '<eb3:PartyInfo>'
+    '<eb3:From>'
+    '<eb3:PartyId type={c2_party_id_type}>{c2_party_id}</eb3:PartyId>'
+    '<eb3:Role>{role}</eb3:Role>'
+    '</eb3:From>'
+    '<eb3:To>'
+    '<eb3:PartyId type={c3_party_id_type}>{c3_party_id}</eb3:PartyId>'
+    '<eb3:Role>{role}</eb3:Role>'
+    '</eb3:To>'
+    '</eb3:PartyInfo>'
+    '<eb3:CollaborationInfo>'
+    '<eb3:Service type="urn:oasis:names:tc:ebcore:ebrs:ebms:binding:1.0">'
+    '{service}'
+    '</eb3:Service>'
+    '<eb3:Action>{action}</eb3:Action>'
+    '<eb3:ConversationId>{conversationid}</eb3:ConversationId>'
+    '</eb3:CollaborationInfo>'
+    '<eb3:MessageProperties>'
+    '<eb3:Property name="originalSender" type={c1_party_id_type}>{c1_party_id}</eb3:Property>'
+    '<eb3:Property name="finalRecipient" type={c4_party_id_type}>{c4_party_id}</eb3:Property>'
+    '</eb3:MessageProperties>'
+    '<eb3:PayloadInfo/>'
+    '</eb3:UserMessage>'
+)
+
+_PAYLOADS_ROOT_OPEN = f'<root xmlns:eb3="{_NS["eb3"]}">'
+_PAYLOADS_ROOT_CLOSE = '</root>'
+
+
+def _part_info(payload: dict[str, str]) -> str:
+    """
+    Renders a single payload description as an escaped ``eb3:PartInfo`` XML fragment.
+
+    :param payload: Dictionary with the keys `href` and `mimetype`, and optionally
+        `CompressionType`.
+    :return: The ``eb3:PartInfo`` element serialized as a string.
+    :rtype: str
+    """
+    href = _xml_attr(payload['href'])
+    mimetype = _xml_text(payload['mimetype'])
+    compression = ''
+    if (compression_type := payload.get('CompressionType')):
+        compression = (
+            '<eb3:Property name="CompressionType">'
+            f'{_xml_text(compression_type)}'
+            '</eb3:Property>'
+        )
+    return (
+        f'<eb3:PartInfo href={href}>'
+        '<eb3:PartProperties>'
+        f'<eb3:Property name="MimeType">{mimetype}</eb3:Property>'
+        f'{compression}'
+        '</eb3:PartProperties>'
+        '</eb3:PartInfo>'
+    )
+
+
 class Header:
     """
     Represents an ebXML-compatible messaging header, allowing for configuration of
@@ -44,6 +169,24 @@ class Header:
     :ivar role: Role URL describing the role of the communicating party.
     """
 
+    __slots__ = (
+        '_xml',
+        'pay_load_info',
+        'c1_party_id',
+        'c1_party_id_type',
+        'c2_party_id',
+        'c2_party_id_type',
+        'c3_party_id',
+        'c3_party_id_type',
+        'c4_party_id',
+        'c4_party_id_type',
+        'conversationid',
+        'service',
+        'service_type',
+        'action',
+        'role',
+    )
+
     def __init__(self,
                  c1_party_id: str,
                  c1_party_id_type: str,
@@ -53,7 +196,7 @@ class Header:
                  c3_party_id_type: str,
                  c4_party_id: str,
                  c4_party_id_type: str,
-                 conversationid: str = str(uuid.uuid4()),
+                 conversationid: str | None = None,
                  service: str = "http://docs.oasis-open.org/ebxml-msg/as4/200902/service",
                  service_type: str = "urn:oasis:names:tc:ebcore:ebrs:ebms:binding:1.0",
                  action: str = "http://docs.oasis-open.org/ebxml-msg/as4/200902/action",
@@ -73,7 +216,7 @@ class Header:
         :param c4_party_id: Identifier for Party 4 involved in the message exchange.
         :param c4_party_id_type: The type of the identifier used for Party 4.
         :param conversationid: (Optional) Unique identifier for the conversation thread.
-            Defaults to a random UUID.
+            Defaults to a freshly generated random UUID (hex form) per instance.
         :param service: (Optional) Service URL to describe the functionality invoked.
             Defaults to "http://docs.oasis-open.org/ebxml-msg/as4/200902/service".
         :param service_type: (Optional) Specific type of the service provided.
@@ -85,10 +228,10 @@ class Header:
         :raises ValueError: If any of the mandatory `c1_party_id`, `c2_party_id`,
             `c3_party_id`, or `c4_party_id` parameters are None.
         """
-        if None in (c1_party_id, c2_party_id, c3_party_id, c4_party_id):
+        if c1_party_id is None or c2_party_id is None or c3_party_id is None or c4_party_id is None:
             raise ValueError("Parameters must not be None")
 
-        self._xml = etree.Element(_nsmap('eb3', 'Messaging'), nsmap=_NS)
+        self._xml = etree.Element(_TAG_MESSAGING, nsmap=_NS_MESSAGING)
 
         self.c1_party_id = c1_party_id
         self.c1_party_id_type = c1_party_id_type
@@ -101,64 +244,41 @@ class Header:
         self.service = service
         self.service_type = service_type
         self.action = action
-        self.conversationid = conversationid
+        self.conversationid = conversationid if conversationid is not None else uuid.uuid4().hex
         self.role = role
-        self.pay_load_info = self.__toxml()
+        self.pay_load_info = self._build_tree()
 
-    def __toxml(self) -> etree._Element:
+    def _build_tree(self) -> etree._Element:
         """
         Generates and returns an XML element representing a `PayloadInfo` node with nested
         structure for UserMessage, PartyInfo, CollaborationInfo, and MessageProperties
         based on the provided instance attributes.
 
-        This method uses the lxml.etree library to structure an XML tree,
-        populating the sub-elements with instance-specific data.
+        The fixed ``UserMessage`` structure is rendered from ``_TEMPLATE`` with the
+        XML-escaped instance data and parsed in a single ``etree.fromstring`` call,
+        then appended to the root ``Messaging`` element.
 
         :return: An XML element 'PayloadInfo' with the nested structure.
         :rtype: etree._Element
         """
 
-        user_message = etree.SubElement(self._xml, _nsmap('eb3', 'UserMessage'))
-
-        party_info = etree.SubElement(user_message, _nsmap('eb3', 'PartyInfo'))
-        froms = etree.SubElement(party_info, _nsmap('eb3', 'From'))
-        etree.SubElement(froms, _nsmap('eb3', 'PartyId'),
-                         attrib={'type': self.c2_party_id_type},
-                         ).text=self.c2_party_id
-        etree.SubElement(froms, _nsmap('eb3', 'Role'),
-                         ).text=self.role
-
-        to = etree.SubElement(party_info, _nsmap('eb3', 'To'))
-        etree.SubElement(to, _nsmap('eb3', 'PartyId'),
-                         attrib={'type': self.c3_party_id_type},
-                         ).text=self.c3_party_id
-        etree.SubElement(to, _nsmap('eb3', 'Role'),
-                         ).text=self.role
-
-        collaboration_info = etree.SubElement(user_message, _nsmap('eb3', 'CollaborationInfo'))
-        etree.SubElement(collaboration_info, _nsmap('eb3', 'Service'),
-                         type="urn:oasis:names:tc:ebcore:ebrs:ebms:binding:1.0",
-                         ).text=self.service
-        etree.SubElement(collaboration_info, _nsmap('eb3', 'Action'),
-                         ).text=self.action
-        etree.SubElement(collaboration_info, _nsmap('eb3', 'ConversationId'),
-                         ).text=self.conversationid
-
-        message_proportis = etree.SubElement(user_message, _nsmap('eb3', 'MessageProperties'))
-        etree.SubElement(message_proportis, _nsmap('eb3', 'Property'),
-                         attrib={
-                             'name': 'originalSender',
-                             'type': self.c1_party_id_type},
-                         ).text=self.c1_party_id
-        etree.SubElement(message_proportis, _nsmap('eb3', 'Property'),
-                         attrib={
-                             'name': 'finalRecipient',
-                             'type': self.c4_party_id_type},
-                         ).text=self.c4_party_id
-
-        pay_load_info = etree.SubElement(user_message, _nsmap('eb3', 'PayloadInfo'))
-
-        return pay_load_info
+        user_message = etree.fromstring(_TEMPLATE.format(
+            c1_party_id=_xml_text(self.c1_party_id),
+            c1_party_id_type=_xml_attr(self.c1_party_id_type),
+            c2_party_id=_xml_text(self.c2_party_id),
+            c2_party_id_type=_xml_attr(self.c2_party_id_type),
+            c3_party_id=_xml_text(self.c3_party_id),
+            c3_party_id_type=_xml_attr(self.c3_party_id_type),
+            c4_party_id=_xml_text(self.c4_party_id),
+            c4_party_id_type=_xml_attr(self.c4_party_id_type),
+            role=_xml_text(self.role),
+            service=_xml_text(self.service),
+            action=_xml_text(self.action),
+            conversationid=_xml_text(self.conversationid),
+        ))
+        self._xml.append(user_message)
+
+        return user_message[-1]
 
     def payload_append(self, payloads: list[dict[str, str]]):
         """
@@ -174,17 +294,15 @@ class Header:
             `CompressionType` (str) is optional.
         :return: None
         """
-        for payload in payloads:
-            pl = etree.SubElement(self.pay_load_info, _nsmap('eb3', 'PartInfo'),
-                                  attrib={'href': payload['href']})
-            pp = etree.SubElement(pl, _nsmap('eb3', 'PartProperties'),)
-            etree.SubElement(pp, _nsmap('eb3', 'Property'),
-                             attrib={'name': "MimeType"},
-                             ).text=payload['mimetype']
-            if payload.get('CompressionType', None):
-                etree.SubElement(pp, _nsmap('eb3', 'Property'),
-                                 attrib={'name': "CompressionType"},
-                                 ).text=payload['CompressionType']
+        if not payloads:
+            return
+
+        # The parsed PartInfo elements are moved from their own document into the
+        # Messaging document; one parse plus one move per batch is still cheaper
+        # than building every element with SubElement once a batch has a few parts.
+        parts = "".join([_part_info(payload) for payload in payloads])
+        fragment = etree.fromstring(_PAYLOADS_ROOT_OPEN + parts + _PAYLOADS_ROOT_CLOSE)
+        self.pay_load_info.extend(list(fragment))
 
     @property
     def element(self) -> etree._Element:
@@ -204,11 +322,36 @@ class Header:
         """
         Provides a property to retrieve the XML representation of an element.
 
-        This property generates and returns the XML content of the associated
-        element in a byte string format with pretty-print formatting applied.
+        This property generates and returns the compact XML content of the
+        associated element in a byte string format, suitable for the wire.
+        The tree is serialized on every access, so changes made through
+        `element` or `pay_load_info` are always included.
+
+        :return: A byte string containing the XML representation of the element.
+        :rtype: Bytes
+        """
+        return etree.tostring(self._xml)
+
+    def write_to(self, fileobj: BinaryIO) -> None:
+        """
+        Writes the XML representation of the element directly into a writable
+        binary file-like object, such as an open file or ``socket.makefile('wb')``.
+
+        The live tree is streamed with ``etree.xmlfile`` without building an
+        intermediate byte string.
+
+        :param fileobj: A writable binary file-like object.
+        :return: None
+        """
+        with etree.xmlfile(fileobj, buffered=False) as xf:
+            xf.write(self._xml)
+
+    def pretty_xml(self) -> bytes:
+        """
+        Returns the XML representation of the element with pretty-print formatting
+        applied, intended for logging and debugging.
 
-        :return: A byte string containing the XML representation of the element
-            with pretty-print formatting.
+        :return: A byte string containing the indented XML representation of the element.
         :rtype: Bytes
         """
-        return etree.tostring(self.element, pretty_print=True)
+        return etree.tostring(self._xml, pretty_print=True)
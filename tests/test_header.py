@@ -0,0 +1,230 @@
+import io
+
+import pytest
+from lxml import etree
+
+from pyAS4.header import Header, _NS
+
+EB3 = _NS["eb3"]
+
+PARTIES = {
+    "c1_party_id": "c1",
+    "c1_party_id_type": "t1",
+    "c2_party_id": "c2",
+    "c2_party_id_type": "t2",
+    "c3_party_id": "c3",
+    "c3_party_id_type": "t3",
+    "c4_party_id": "c4",
+    "c4_party_id_type": "t4",
+}
+
+TEXT_FIELDS = ["c1_party_id", "c2_party_id", "role", "service", "action", "conversationid"]
+ATTR_FIELDS = ["c1_party_id_type", "c2_party_id_type", "c3_party_id_type", "c4_party_id_type"]
+
+EDGE_VALUES = [
+    "plain",
+    "",
+    "a\r\nz",
+    "cr\ronly",
+    "t\nx",
+    "tab\there",
+    "q\"'",
+    "<>&",
+    "]]>",
+    "  padded  ",
+    "é€",
+    "astral \U0001F600",
+]
+
+INVALID_VALUES = ["\x00", "\x01", "\x0b", "\x1f", "\ud800", "￾"]
+
+
+def _tag(name):
+    return f"{{{EB3}}}{name}"
+
+
+def _reference(fields, payloads=()):
+    """Builds the expected tree element by element with SubElement."""
+    root = etree.Element(_tag("Messaging"), nsmap={"eb3": EB3})
+    user_message = etree.SubElement(root, _tag("UserMessage"))
+    party_info = etree.SubElement(user_message, _tag("PartyInfo"))
+    for side, party in (("From", "c2"), ("To", "c3")):
+        node = etree.SubElement(party_info, _tag(side))
+        etree.SubElement(node, _tag("PartyId"),
+                         attrib={"type": fields[f"{party}_party_id_type"]},
+                         ).text = fields[f"{party}_party_id"]
+        etree.SubElement(node, _tag("Role")).text = fields["role"]
+    collaboration_info = etree.SubElement(user_message, _tag("CollaborationInfo"))
+    etree.SubElement(collaboration_info, _tag("Service"),
+                     type="urn:oasis:names:tc:ebcore:ebrs:ebms:binding:1.0",
+                     ).text = fields["service"]
+    etree.SubElement(collaboration_info, _tag("Action")).text = fields["action"]
+    etree.SubElement(collaboration_info, _tag("ConversationId"),
+                     ).text = fields["conversationid"]
+    message_properties = etree.SubElement(user_message, _tag("MessageProperties"))
+    for name, party in (("originalSender", "c1"), ("finalRecipient", "c4")):
+        etree.SubElement(message_properties, _tag("Property"),
+                         attrib={"name": name, "type": fields[f"{party}_party_id_type"]},
+                         ).text = fields[f"{party}_party_id"]
+    pay_load_info = etree.SubElement(user_message, _tag("PayloadInfo"))
+    for payload in payloads:
+        pl = etree.SubElement(pay_load_info, _tag("PartInfo"),
+                              attrib={"href": payload["href"]})
+        pp = etree.SubElement(pl, _tag("PartProperties"))
+        etree.SubElement(pp, _tag("Property"),
+                         attrib={"name": "MimeType"}).text = payload["mimetype"]
+        if payload.get("CompressionType"):
+            etree.SubElement(pp, _tag("Property"),
+                             attrib={"name": "CompressionType"},
+                             ).text = payload["CompressionType"]
+    return root
+
+
+def _fields(**overrides):
+    fields = dict(
+        PARTIES,
+        conversationid="conv",
+        service="http://docs.oasis-open.org/ebxml-msg/as4/200902/service",
+        action="http://docs.oasis-open.org/ebxml-msg/as4/200902/action",
+        role="http://sdg.europa.eu/edelivery/gateway",
+    )
+    fields.update(overrides)
+    return fields
+
+
+def _assert_same(header, expected):
+    # C14N so that an empty string (``<a></a>``) and no text (``<a/>``) compare equal.
+    actual = etree.fromstring(header.xml)
+    assert etree.tostring(actual, method="c14n") == etree.tostring(expected, method="c14n")
+
+
+@pytest.mark.parametrize("field", TEXT_FIELDS + ATTR_FIELDS)
+@pytest.mark.parametrize("value", EDGE_VALUES)
+def test_header_matches_subelement_tree(field, value):
+    fields = _fields(**{field: value})
+    _assert_same(Header(**fields), _reference(fields))
+
+
+@pytest.mark.parametrize("field", ["role", "service", "action"])
+def test_none_text_renders_empty_element(field):
+    fields = _fields(**{field: None})
+    _assert_same(Header(**fields), _reference(fields))
+
+
+@pytest.mark.parametrize("field", ATTR_FIELDS)
+@pytest.mark.parametrize("value", [None, 5])
+def test_non_str_attribute_raises_type_error(field, value):
+    with pytest.raises(TypeError):
+        Header(**_fields(**{field: value}))
+
+
+@pytest.mark.parametrize("field", ["c2_party_id", "role"])
+def test_non_str_text_raises_type_error(field):
+    with pytest.raises(TypeError):
+        Header(**_fields(**{field: 5}))
+
+
+@pytest.mark.parametrize("field", TEXT_FIELDS + ATTR_FIELDS)
+@pytest.mark.parametrize("value", INVALID_VALUES)
+def test_invalid_characters_raise_value_error(field, value):
+    with pytest.raises(ValueError, match="XML compatible"):
+        Header(**_fields(**{field: f"a{value}b"}))
+
+
+@pytest.mark.parametrize("field", ["c1_party_id", "c1_party_id_type", "role"])
+def test_ascii_bytes_are_accepted(field):
+    header = Header(**_fields(**{field: b"ascii <&>"}))
+    _assert_same(header, _reference(_fields(**{field: "ascii <&>"})))
+
+
+@pytest.mark.parametrize("field", ["c1_party_id", "c1_party_id_type", "role"])
+@pytest.mark.parametrize("value", ["é".encode(), b"\xff", b"a\x01"])
+def test_non_ascii_or_invalid_bytes_raise_value_error(field, value):
+    with pytest.raises(ValueError, match="XML compatible"):
+        Header(**_fields(**{field: value}))
+
+
+@pytest.mark.parametrize("key", ["href", "mimetype", "CompressionType"])
+@pytest.mark.parametrize("value", EDGE_VALUES)
+def test_payload_matches_subelement_tree(key, value):
+    payload = {
+        "href": "cid:part",
+        "mimetype": "application/xml",
+        "CompressionType": "application/gzip",
+    }
+    payload[key] = value
+    payloads = [payload, {"href": "cid:second", "mimetype": "text/plain"}]
+    fields = _fields()
+    header = Header(**fields)
+    header.payload_append(payloads)
+    _assert_same(header, _reference(fields, payloads))
+
+
+def test_payload_none_mimetype_renders_empty_property():
+    payloads = [{"href": "cid:part", "mimetype": None}]
+    fields = _fields()
+    header = Header(**fields)
+    header.payload_append(payloads)
+    _assert_same(header, _reference(fields, payloads))
+
+
+@pytest.mark.parametrize("key", ["href", "mimetype", "CompressionType"])
+@pytest.mark.parametrize("value", INVALID_VALUES)
+def test_payload_invalid_characters_raise_value_error(key, value):
+    payload = {"href": "cid:part", "mimetype": "application/xml"}
+    payload[key] = f"a{value}b"
+    with pytest.raises(ValueError, match="XML compatible"):
+        Header(**_fields()).payload_append([payload])
+
+
+def test_payload_non_str_href_raises_type_error():
+    with pytest.raises(TypeError):
+        Header(**_fields()).payload_append([{"href": 5, "mimetype": "text/plain"}])
+
+
+def test_payload_append_in_several_batches():
+    batches = [[{"href": f"cid:{i}-{j}", "mimetype": "text/plain"} for j in range(3)]
+               for i in range(3)]
+    fields = _fields()
+    header = Header(**fields)
+    for batch in batches:
+        header.payload_append(batch)
+    header.payload_append([])
+    _assert_same(header, _reference(fields, [p for batch in batches for p in batch]))
+
+
+def test_default_conversation_id_is_unique():
+    assert Header(**PARTIES).conversationid != Header(**PARTIES).conversationid
+
+
+def test_write_to_streams_edits_made_through_retained_reference():
+    header = Header(**_fields())
+    pay_load_info = header.pay_load_info
+    before = io.BytesIO()
+    header.write_to(before)
+    etree.SubElement(pay_load_info, _tag("PartInfo"), attrib={"href": "cid:late"})
+    after = io.BytesIO()
+    header.write_to(after)
+    assert b"cid:late" not in before.getvalue()
+    assert after.getvalue() == etree.tostring(header.element)
+    assert b"cid:late" in after.getvalue()
+
+
+def test_xml_includes_edits_made_through_retained_references():
+    header = Header(**_fields())
+    element = header.element
+    pay_load_info = header.pay_load_info
+    before = header.xml
+    etree.SubElement(pay_load_info, _tag("PartInfo"), attrib={"href": "cid:late"})
+    etree.SubElement(element, _tag("Extra"))
+    assert header.xml != before
+    assert header.xml == etree.tostring(header.element)
+    assert b"cid:late" in header.xml
+    assert b"<eb3:Extra/>" in header.xml
+
+
+def test_pay_load_info_is_assignable():
+    header = Header(**_fields())
+    header.pay_load_info = header.pay_load_info
+    header.payload_append([{"href": "cid:part", "mimetype": "text/plain"}])
+    assert b"cid:part" in header.xml